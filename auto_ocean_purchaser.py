@@ -6,56 +6,200 @@ Wallet + REST API combination for real purchase simulation
 
 import json
 import os
+import sys
+import shutil
 import hashlib
 import time
+import threading
+import asyncio
+import concurrent.futures
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import cached_property, partial
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, BinaryIO, List, Optional, Tuple, Union
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 
+# Faster JSON (optional): fall back to stdlib json when orjson is unavailable
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+# Async HTTP client (optional): purchase_all falls back to threads without it
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Streaming JSON parser (optional): JSON downloads are validated when available
+try:
+    import ijson
+    try:
+        _ijson_backend = ijson.get_backend("yajl2_c")
+    except ImportError:
+        _ijson_backend = ijson
+except ImportError:
+    ijson = None
+    _ijson_backend = None
+
+# zstd compression (optional): required only for compressed downloads
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "now" shared by all steps of the current workflow run (per thread / task)
+_workflow_now: ContextVar[Optional[int]] = ContextVar("workflow_now", default=None)
+
+# Known dataset information
+_DATASET_INFO = {
+    "enron": {
+        "did": "did:op:1beabb1e18d4d5b15facabf9d0ac2fd38a0b00138ae4b3f9f6649cb6f44458dd",
+        "name": "Enron Email Dataset",
+        "sample_url": "https://e1k3lz2wcg.execute-api.us-west-2.amazonaws.com/data",
+        "estimated_price": "0.1 OCEAN",
+        "format": "csv"
+    },
+    "cameroon": {
+        "did": "did:op:204e60c2a0f935d68743955afe1b4bb965770cfbc70342520d6bcecf75befe9c", 
+        "name": "Cameroon Gazette Dataset",
+        "sample_url": "https://yjiuaiehxf.execute-api.us-west-2.amazonaws.com/data",
+        "estimated_price": "0.05 OCEAN",
+        "format": "json"
+    }
+}
+
+# Frozen view with the DID pre-encoded for transaction hashing
+_DATASETS = MappingProxyType({
+    key: MappingProxyType({**info, "did_bytes": info["did"].encode('utf-8')})
+    for key, info in _DATASET_INFO.items()
+})
+
+def open_dataset(filepath: Union[str, Path]) -> BinaryIO:
+    """Open a downloaded dataset for binary reading, decompressing .zst files"""
+    path = Path(filepath)
+    f = open(path, 'rb')
+    if path.suffix == '.zst':
+        if zstd is None:
+            f.close()
+            raise RuntimeError("zstandard is required to read .zst datasets (pip install zstandard)")
+        return zstd.ZstdDecompressor().stream_reader(f)
+    return f
+
 class AutomatedOceanPurchaser:
     """Fully Automated Ocean Protocol Purchaser"""
     
-    def __init__(self, keystore_path: str):
+    def __init__(self, keystore_path: str, simulate_delay: bool = False, compress: bool = False):
         """
         Initialize
         
         Args:
             keystore_path: Keystore file path
+            simulate_delay: Insert demo delays for wallet/blockchain steps
+            compress: Store downloads zstd-compressed (*.zst)
         """
         self.keystore_path = keystore_path
-        self.wallet_info = self._load_wallet_info()
+        self._delay = simulate_delay
+        
+        if compress and zstd is None:
+            logger.warning("zstandard not installed, downloads will be stored uncompressed")
+            compress = False
+        self.compress = compress
         
         # Ocean Protocol endpoints
         self.aquarius_url = "https://v4.aquarius.oceanprotocol.com"
         self.provider_url = "https://v4.provider.oceanprotocol.com"
         
-        # Known dataset information
-        self.datasets = {
-            "enron": {
-                "did": "did:op:1beabb1e18d4d5b15facabf9d0ac2fd38a0b00138ae4b3f9f6649cb6f44458dd",
-                "name": "Enron Email Dataset",
-                "sample_url": "https://e1k3lz2wcg.execute-api.us-west-2.amazonaws.com/data",
-                "estimated_price": "0.1 OCEAN",
-                "format": "csv"
-            },
-            "cameroon": {
-                "did": "did:op:204e60c2a0f935d68743955afe1b4bb965770cfbc70342520d6bcecf75befe9c", 
-                "name": "Cameroon Gazette Dataset",
-                "sample_url": "https://yjiuaiehxf.execute-api.us-west-2.amazonaws.com/data",
-                "estimated_price": "0.05 OCEAN",
-                "format": "json"
-            }
-        }
+        # Shared HTTP session (keep-alive connection reuse across downloads)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+        
+        # Purchase records log
+        self.records_path = Path("purchases/purchase_records.jsonl")
+        self.records_path.parent.mkdir(parents=True, exist_ok=True)
+        # O_APPEND makes each single-write record append atomic, even across threads
+        self._records_fd = os.open(self.records_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        
+        # Pricing quotes per dataset, reused until they expire
+        self._pricing_cache: Dict[str, Dict[str, Any]] = {}
+        
+        # Whether the Provider accepts batched downloads (None = not probed yet)
+        self._batch_download_supported: Optional[bool] = None
+        
+        # Known dataset information (shared, read-only)
+        self.datasets = _DATASETS
+    
+    def close(self):
+        """Close the shared HTTP session and the purchase records log"""
+        self.session.close()
+        if self._records_fd is not None:
+            os.close(self._records_fd)
+            self._records_fd = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _now(self) -> int:
+        """Current workflow timestamp (falls back to the live clock)"""
+        now = _workflow_now.get()
+        if now is None:
+            now = time.time_ns() // 1_000_000_000
+        return now
+    
+    def _simulate_delay(self, seconds: float):
+        """Sleep only when demo delays are enabled"""
+        if self._delay:
+            time.sleep(seconds)
+    
+    @cached_property
+    def wallet_info(self) -> Dict[str, str]:
+        """Wallet information (keystore is read on first use)"""
+        return self._load_wallet_info()
+    
+    @cached_property
+    def _addr_bytes(self) -> bytes:
+        """Wallet address pre-encoded for hashing"""
+        return self.wallet_info.get("address", "").encode('utf-8')
     
     def _load_wallet_info(self) -> Dict[str, str]:
         """Load wallet information"""
         try:
-            with open(self.keystore_path, 'r') as f:
-                keystore = json.load(f)
+            with open(self.keystore_path, 'rb') as f:
+                keystore = _loads(f.read())
             
             return {
                 "address": keystore.get("address", "Unknown"),
@@ -69,7 +213,7 @@ class AutomatedOceanPurchaser:
     def simulate_wallet_connection(self) -> bool:
         """Simulate wallet connection"""
         logger.info("Simulating wallet connection...")
-        time.sleep(1)
+        self._simulate_delay(1)
         
         if not self.wallet_info or "address" not in self.wallet_info:
             logger.error("No wallet information available.")
@@ -81,7 +225,7 @@ class AutomatedOceanPurchaser:
     def check_ocean_balance(self) -> Dict[str, Any]:
         """Check OCEAN token balance (simulation)"""
         logger.info("Checking OCEAN token balance...")
-        time.sleep(0.5)
+        self._simulate_delay(0.5)
         
         # In reality, this would query the blockchain for balance
         # Here we simulate
@@ -97,10 +241,19 @@ class AutomatedOceanPurchaser:
         return balance
     
     def get_dataset_pricing(self, dataset_key: str) -> Dict[str, Any]:
-        """Query dataset pricing information"""
+        """Query dataset pricing information (cached while the quote is valid)"""
         if dataset_key not in self.datasets:
             return {"error": "Unknown dataset"}
         
+        pricing = self._pricing_cache.get(dataset_key)
+        if pricing is None or pricing["valid_until"] <= self._now():
+            pricing = self._compute_pricing(dataset_key)
+            self._pricing_cache[dataset_key] = pricing
+        
+        return pricing
+    
+    def _compute_pricing(self, dataset_key: str) -> Dict[str, Any]:
+        """Build pricing information for a dataset"""
         dataset = self.datasets[dataset_key]
         
         logger.info(f"Querying price information: {dataset['name']}")
@@ -110,33 +263,38 @@ class AutomatedOceanPurchaser:
             "price": dataset["estimated_price"],
             "currency": "OCEAN",
             "access_type": "one-time",
-            "valid_until": int(time.time()) + 86400,  # Expires in 24 hours
+            "valid_until": self._now() + 86400,  # Expires in 24 hours
             "gas_estimate": "0.002 ETH"
         }
         
         return pricing
     
-    def simulate_purchase_transaction(self, dataset_key: str) -> Dict[str, Any]:
+    def simulate_purchase_transaction(self, dataset_key: str, pricing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Simulate purchase transaction"""
         dataset = self.datasets[dataset_key]
-        pricing = self.get_dataset_pricing(dataset_key)
+        if pricing is None:
+            pricing = self.get_dataset_pricing(dataset_key)
         
         logger.info(f"Creating purchase transaction: {dataset['name']}")
         logger.info(f"Price: {pricing['price']}")
         
         # Generate transaction hash (simulation)
-        tx_data = f"{self.wallet_info['address']}{dataset['did']}{int(time.time())}"
-        tx_hash = hashlib.sha256(tx_data.encode()).hexdigest()
+        now = self._now()
+        h = hashlib.sha256()
+        h.update(self._addr_bytes)
+        h.update(dataset["did_bytes"])
+        h.update(now.to_bytes(8, 'little'))
+        tx_hash = h.hexdigest()
         
         logger.info("Sending transaction...")
-        time.sleep(2)  # Simulate blockchain processing time
+        self._simulate_delay(2)  # Simulate blockchain processing time
         
         transaction = {
             "tx_hash": f"0x{tx_hash}",
             "status": "confirmed",
-            "block_number": 18500000 + int(time.time()) % 1000,
+            "block_number": 18500000 + now % 1000,
             "gas_used": "45000",
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         logger.info(f"Transaction confirmed: {transaction['tx_hash'][:10]}...")
@@ -147,16 +305,98 @@ class AutomatedOceanPurchaser:
         logger.info("Generating dataset access token...")
         
         # In reality, Provider validates transaction and issues token
-        token_data = f"{tx_hash}{dataset_key}{self.wallet_info['address']}"
-        access_token = hashlib.md5(token_data.encode()).hexdigest()
+        h = hashlib.blake2b(digest_size=16)
+        h.update(tx_hash.encode('utf-8'))
+        h.update(dataset_key.encode('utf-8'))
+        h.update(self._addr_bytes)
+        access_token = h.hexdigest()
         
-        time.sleep(1)
+        self._simulate_delay(1)
         logger.info(f"Access token issued: {access_token[:16]}...")
         
         return access_token
     
-    def download_full_dataset(self, dataset_key: str, access_token: str, output_dir: str = "./purchases") -> bool:
-        """Download full dataset"""
+    def _output_filepath(self, dataset_key: str, output_dir: str) -> Path:
+        """Create output directory and return the dataset file path"""
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        # Save as "full" dataset (actually same as sample for simulation)
+        filename = f"{dataset_key}_full_dataset.{self.datasets[dataset_key]['format']}"
+        if self.compress:
+            filename += ".zst"
+        return output_path / filename
+    
+    @contextmanager
+    def _open_sink(self, filepath: Path):
+        """Open a download target for writing, compressing .zst files on the fly"""
+        with open(filepath, 'wb') as f:
+            if filepath.suffix == '.zst':
+                with zstd.ZstdCompressor(level=3, threads=-1).stream_writer(f, closefd=False) as writer:
+                    yield writer
+            else:
+                yield f
+    
+    def _download_cache_path(self, url: str, access_token: str, filepath: Path) -> Path:
+        """Content-addressed cache entry for a (URL, access token) download"""
+        cache_dir = filepath.parent / ".cache"
+        cache_dir.mkdir(exist_ok=True)
+        
+        h = hashlib.blake2b(digest_size=16)
+        h.update(url.encode('utf-8'))
+        h.update(access_token.encode('utf-8'))
+        # Named after the output file, so compressed and plain entries stay apart
+        # and superseded entries for the same output can be found
+        return cache_dir / f"{h.hexdigest()}.{filepath.name}"
+    
+    @contextmanager
+    def _partial_download(self, cache_path: Path):
+        """Per-thread temporary file for filling a cache entry (removed on exit)"""
+        suffix = ".zst" if cache_path.suffix == ".zst" else ""
+        partial_path = cache_path.with_name(f"{cache_path.stem}.{threading.get_ident()}.part{suffix}")
+        try:
+            yield partial_path
+        finally:
+            partial_path.unlink(missing_ok=True)
+    
+    def _publish_cached(self, cache_path: Path, filepath: Path):
+        """Expose a cache entry at the output path (hardlink when possible)"""
+        filepath.unlink(missing_ok=True)
+        try:
+            os.link(cache_path, filepath)
+        except OSError:
+            shutil.copyfile(cache_path, filepath)
+    
+    def _validate_stream_json(self, filepath: Path) -> bool:
+        """Stream-parse a JSON file to check it is well-formed (constant memory)"""
+        if _ijson_backend is None:
+            return True
+        
+        events = 0
+        try:
+            with open_dataset(filepath) as f:
+                for _ in _ijson_backend.parse(f, use_float=True):
+                    events += 1
+        except ijson.JSONError as e:
+            logger.error(f"Invalid JSON in {filepath}: {e}")
+            return False
+        
+        logger.info(f"JSON validated: {events:,} parse events")
+        return True
+    
+    def _finish_download(self, dataset_key: str, access_token: str, filepath: Path) -> bool:
+        """Log the downloaded file and save the purchase record"""
+        file_size = filepath.stat().st_size
+        logger.info(f"Download completed: {filepath} ({file_size:,} bytes)")
+        
+        # Save purchase record
+        self._save_purchase_record(dataset_key, access_token, str(filepath))
+        
+        return True
+    
+    def _prepare_download(self, dataset_key: str, access_token: str, output_dir: str,
+                          url: Optional[str]) -> Tuple[str, Path, Path]:
+        """Resolve the URL, output path and cache entry of a dataset download"""
         dataset = self.datasets[dataset_key]
         
         logger.info(f"Starting full dataset download: {dataset['name']}")
@@ -164,29 +404,163 @@ class AutomatedOceanPurchaser:
         # In reality, Provider validates access token and provides actual data
         # Here we simulate using sample data as "full data"
         
+        # Download data from sample URL (in reality would be private URL)
+        url = url or dataset['sample_url']
+        filepath = self._output_filepath(dataset_key, output_dir)
+        return url, filepath, self._download_cache_path(url, access_token, filepath)
+    
+    def _publish_download(self, dataset_key: str, access_token: str, cache_path: Path, filepath: Path) -> bool:
+        """Expose a cache entry at the output path and record the purchase"""
+        self._publish_cached(cache_path, filepath)
+        return self._finish_download(dataset_key, access_token, filepath)
+    
+    def _store_download(self, dataset_key: str, access_token: str, partial_path: Path,
+                        cache_path: Path, filepath: Path) -> bool:
+        """Validate a finished transfer, move it into the cache and publish it"""
+        # Malformed downloads never enter the cache, so a retry fetches them again
+        if self.datasets[dataset_key]['format'] == 'json' and not self._validate_stream_json(partial_path):
+            return False
+        
+        os.replace(partial_path, cache_path)
+        success = self._publish_download(dataset_key, access_token, cache_path, filepath)
+        
+        # Each purchase brings a new access token; drop entries it superseded
+        for stale in cache_path.parent.glob(f"*.{filepath.name}"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+        
+        return success
+    
+    def download_full_dataset(self, dataset_key: str, access_token: str, output_dir: str = "./purchases",
+                              url: Optional[str] = None) -> bool:
+        """Download full dataset (from `url` if the Provider handed one out)"""
         try:
-            # Download data from sample URL (in reality would be private URL)
-            response = requests.get(dataset['sample_url'], timeout=30)
-            response.raise_for_status()
+            url, filepath, cache_path = self._prepare_download(dataset_key, access_token, output_dir, url)
+            
+            # Re-downloads with the same access token are served from disk
+            if cache_path.exists():
+                logger.info(f"Using cached download: {cache_path}")
+                return self._publish_download(dataset_key, access_token, cache_path, filepath)
             
-            # Create output directory
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
+            with self._partial_download(cache_path) as partial_path:
+                response = self.session.get(url, timeout=30, stream=True)
+                response.raise_for_status()
+                
+                # Stream raw bytes to disk (never touches response.text / charset detection)
+                response.raw.decode_content = True
+                with self._open_sink(partial_path) as f:
+                    shutil.copyfileobj(response.raw, f, 1 << 20)
+                
+                return self._store_download(dataset_key, access_token, partial_path, cache_path, filepath)
             
-            # Save as "full" dataset (actually same as sample for simulation)
-            filename = f"{dataset_key}_full_dataset.{dataset['format']}"
-            filepath = output_path / filename
+        except Exception as e:
+            logger.error(f"Download failed: {e}")
+            return False
+    
+    def _request_download_batch(self, dataset_keys: List[str], access_tokens: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Ask the Provider for download URLs of several datasets in one request"""
+        if self._batch_download_supported is False:
+            return None
+        
+        keys_by_did = {self.datasets[key]['did']: key for key in dataset_keys}
+        payload = {"items": [{"did": self.datasets[key]['did'], "token": access_tokens[key]} for key in dataset_keys]}
+        
+        try:
+            response = self.session.post(f"{self.provider_url}/services/downloadBatch",
+                                         json=payload, timeout=30, stream=True)
+        except requests.RequestException as e:
+            logger.warning(f"Batch download request failed: {e}")
+            return None
+        
+        with response:
+            if response.status_code in (404, 405, 501):
+                logger.info("Provider has no batch download endpoint, downloading datasets individually")
+                self._batch_download_supported = False
+                return None
+            if response.status_code != 200:
+                logger.warning(f"Batch download request failed: HTTP {response.status_code}")
+                return None
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            self._batch_download_supported = True
             
-            file_size = filepath.stat().st_size
-            logger.info(f"Download completed: {filepath} ({file_size:,} bytes)")
+            # NDJSON manifest: one {"did": ..., "url": ...} object per line
+            # (datasets without a usable line fall back to their own download URL)
+            urls = {}
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        item = _loads(line)
+                    except ValueError:
+                        item = None
+                    if not isinstance(item, dict) or not isinstance(item.get("did"), str):
+                        logger.warning(f"Skipping malformed batch manifest line: {line[:80]!r}")
+                        continue
+                    
+                    dataset_key = keys_by_did.get(item["did"])
+                    if dataset_key and isinstance(item.get("url"), str):
+                        urls[dataset_key] = item["url"]
+            except requests.RequestException as e:
+                logger.warning(f"Batch download manifest could not be read: {e}")
+                return None
+        
+        return urls
+    
+    def download_full_datasets(self, dataset_keys: List[str], access_tokens: Dict[str, str],
+                               output_dir: str = "./purchases",
+                               timestamps: Optional[Dict[str, int]] = None) -> Dict[str, bool]:
+        """Download several purchased datasets using one batched Provider call
+        
+        `timestamps` holds the workflow timestamp each dataset was purchased at,
+        so its purchase record carries the same time as its transaction.
+        """
+        urls = self._request_download_batch(dataset_keys, access_tokens) or {}
+        timestamps = timestamps or {}
+        
+        # Fetch the datasets concurrently over the shared keep-alive session
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(dataset_keys))) as executor:
+            futures = {
+                key: executor.submit(self._download_in_workflow, timestamps.get(key),
+                                     key, access_tokens[key], output_dir, urls.get(key))
+                for key in dataset_keys
+            }
+        return {key: future.result() for key, future in futures.items()}
+    
+    def _download_in_workflow(self, now: Optional[int], dataset_key: str, access_token: str,
+                              output_dir: str, url: Optional[str]) -> bool:
+        """download_full_dataset under the timestamp of the workflow that purchased it"""
+        with self._workflow_clock(now):
+            return self.download_full_dataset(dataset_key, access_token, output_dir, url)
+    
+    async def _adownload_in_workflow(self, now: int, dataset_key: str, access_token: str,
+                                     client: "httpx.AsyncClient", url: Optional[str]) -> bool:
+        """_adownload under the timestamp of the workflow that purchased it"""
+        with self._workflow_clock(now):
+            return await self._adownload(dataset_key, access_token, client, url=url)
+    
+    async def _adownload(self, dataset_key: str, access_token: str, client: "httpx.AsyncClient",
+                         output_dir: str = "./purchases", url: Optional[str] = None) -> bool:
+        """Download full dataset with an async HTTP client (disk work runs off the event loop)"""
+        try:
+            url, filepath, cache_path = self._prepare_download(dataset_key, access_token, output_dir, url)
             
-            # Save purchase record
-            self._save_purchase_record(dataset_key, access_token, str(filepath))
+            if cache_path.exists():
+                logger.info(f"Using cached download: {cache_path}")
+                return await asyncio.to_thread(self._publish_download, dataset_key, access_token, cache_path, filepath)
             
-            return True
+            with self._partial_download(cache_path) as partial_path:
+                async with client.stream("GET", url, timeout=30.0) as response:
+                    response.raise_for_status()
+                    
+                    with self._open_sink(partial_path) as f:
+                        async for chunk in response.aiter_bytes(1 << 20):
+                            # zstd compression of the chunk happens in the write
+                            await asyncio.to_thread(f.write, chunk)
+                
+                return await asyncio.to_thread(
+                    self._store_download, dataset_key, access_token, partial_path, cache_path, filepath
+                )
             
         except Exception as e:
             logger.error(f"Download failed: {e}")
@@ -196,72 +570,204 @@ class AutomatedOceanPurchaser:
         """Save purchase record"""
         record = {
             "dataset": dataset_key,
-            "timestamp": int(time.time()),
+            "timestamp": self._now(),
             "access_token": access_token,
             "file_path": filepath,
             "wallet_address": f"0x{self.wallet_info['address']}",
             "status": "completed"
         }
         
-        records_file = Path("purchases/purchase_records.json")
-        records_file.parent.mkdir(exist_ok=True)
-        
-        # Load existing records
-        if records_file.exists():
-            with open(records_file, 'r') as f:
-                records = json.load(f)
-        else:
-            records = []
-        
-        records.append(record)
+        # Append one record per line (no need to re-read existing records)
+        os.write(self._records_fd, _dumps(record) + b'\n')
         
-        # Save records
-        with open(records_file, 'w') as f:
-            json.dump(records, f, indent=2)
-        
-        logger.info(f"Purchase record saved: {records_file}")
+        logger.info(f"Purchase record saved: {self.records_path}")
+    
+    @contextmanager
+    def _workflow_clock(self, now: Optional[int] = None):
+        """Fix the timestamp used by every step of one workflow run (`now` resumes a run)"""
+        token = _workflow_now.set(time.time_ns() // 1_000_000_000 if now is None else now)
+        try:
+            yield
+        finally:
+            _workflow_now.reset(token)
     
     def automated_purchase_workflow(self, dataset_key: str) -> bool:
         """Fully automated purchase workflow"""
         logger.info(f"=== Starting Automated Purchase: {dataset_key} ===")
         
+        with self._workflow_clock():
+            access_token = self._purchase_access(dataset_key)
+            if access_token is None:
+                return False
+            
+            # 7. Download dataset
+            success = self.download_full_dataset(dataset_key, access_token)
+        
+        return self._log_workflow_result(success)
+    
+    def _log_workflow_result(self, success: bool) -> bool:
+        """Log the final workflow status"""
+        if success:
+            logger.info("=== Automated Purchase Completed ===")
+        else:
+            logger.error("=== Automated Purchase Failed ===")
+        
+        return success
+    
+    def _purchase_access(self, dataset_key: str) -> Optional[str]:
+        """Purchase steps up to the access token (None on failure)"""
         # 1. Connect wallet
         if not self.simulate_wallet_connection():
-            return False
+            return None
         
         # 2. Check balance
         balance = self.check_ocean_balance()
         if balance.get("status") != "sufficient":
             logger.error("Insufficient balance.")
-            return False
+            return None
         
         # 3. Check pricing information
         pricing = self.get_dataset_pricing(dataset_key)
         if "error" in pricing:
             logger.error(f"Failed to query price information: {pricing['error']}")
-            return False
+            return None
         
         # 4. User approval (skipped in automation)
         logger.info(f"Purchase approved: paying {pricing['price']}")
         
         # 5. Execute purchase transaction
-        transaction = self.simulate_purchase_transaction(dataset_key)
+        transaction = self.simulate_purchase_transaction(dataset_key, pricing)
         if transaction.get("status") != "confirmed":
             logger.error("Transaction failed")
-            return False
+            return None
         
         # 6. Generate access token
-        access_token = self.generate_access_token(dataset_key, transaction["tx_hash"])
+        return self.generate_access_token(dataset_key, transaction["tx_hash"])
+    
+    def _purchase_workflow_access(self, dataset_key: str) -> Optional[Tuple[str, int]]:
+        """Purchase steps of one workflow run: (access token, workflow timestamp), None on failure"""
+        logger.info(f"=== Starting Automated Purchase: {dataset_key} ===")
+        
+        try:
+            with self._workflow_clock():
+                access_token = self._purchase_access(dataset_key)
+                return None if access_token is None else (access_token, self._now())
+        except Exception as e:
+            logger.error(f"{dataset_key} purchase raised an error: {e}")
+            return None
+    
+    def _workflow_results(self, dataset_keys: List[str], downloads: Dict[str, bool]) -> Dict[str, bool]:
+        """Per-dataset outcome (datasets that were never purchased count as failed)"""
+        return {
+            key: self._log_workflow_result(downloads[key]) if key in downloads else False
+            for key in dataset_keys
+        }
+    
+    def purchase_all(self, dataset_keys: List[str]) -> Dict[str, bool]:
+        """Purchase several datasets concurrently, then download them in one batch"""
+        if httpx is not None:
+            return asyncio.run(self.purchase_all_async(dataset_keys))
         
-        # 7. Download dataset
-        success = self.download_full_dataset(dataset_key, access_token)
+        # Purchase steps are I/O-bound, so threads overlap them well enough
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(dataset_keys))) as executor:
+            runs = dict(zip(dataset_keys, executor.map(self._purchase_workflow_access, dataset_keys)))
         
-        if success:
-            logger.info("=== Automated Purchase Completed ===")
-        else:
-            logger.error("=== Automated Purchase Failed ===")
+        # 7. Download datasets (each within its own workflow's timestamp)
+        purchased = {key: run[0] for key, run in runs.items() if run is not None}
+        timestamps = {key: run[1] for key, run in runs.items() if run is not None}
+        downloads = self.download_full_datasets(list(purchased), purchased, timestamps=timestamps) if purchased else {}
         
-        return success
+        return self._workflow_results(dataset_keys, downloads)
+    
+    async def purchase_all_async(self, dataset_keys: List[str]) -> Dict[str, bool]:
+        """Purchase several datasets, then download them in one batch on one event loop"""
+        # Purchase steps only block on demo delays; keep them off the event loop
+        runs = await asyncio.gather(*(asyncio.to_thread(self._purchase_workflow_access, key) for key in dataset_keys))
+        purchased = {key: run[0] for key, run in zip(dataset_keys, runs) if run is not None}
+        timestamps = {key: run[1] for key, run in zip(dataset_keys, runs) if run is not None}
+        if not purchased:
+            return self._workflow_results(dataset_keys, {})
+        
+        # 7. Download datasets (one Provider call for all download URLs)
+        urls = await asyncio.to_thread(self._request_download_batch, list(purchased), purchased) or {}
+        
+        limits = httpx.Limits(max_keepalive_connections=8, max_connections=16)
+        # Retries failed connections like the sync session's Retry policy; unlike it,
+        # 502/503/504 responses are not retried here
+        transport = httpx.AsyncHTTPTransport(http2=_HTTP2_AVAILABLE, limits=limits, retries=3)
+        async with httpx.AsyncClient(transport=transport) as client:
+            results = await asyncio.gather(
+                *(self._adownload_in_workflow(timestamps[key], key, token, client, urls.get(key))
+                  for key, token in purchased.items()),
+                return_exceptions=True
+            )
+        
+        downloads = {}
+        for dataset_key, result in zip(purchased, results):
+            if isinstance(result, BaseException):
+                logger.error(f"{dataset_key} download raised an error: {result}")
+                result = False
+            downloads[dataset_key] = result
+        return self._workflow_results(dataset_keys, downloads)
+
+def _purchase_one(dataset_key: str, purchaser: AutomatedOceanPurchaser) -> bool:
+    """Menu action: purchase a single dataset"""
+    purchaser.automated_purchase_workflow(dataset_key)
+    return True
+
+def _purchase_all(purchaser: AutomatedOceanPurchaser) -> bool:
+    """Menu action: purchase every known dataset"""
+    dataset_keys = list(purchaser.datasets.keys())
+    for dataset_key in dataset_keys:
+        print(f"\n--- Starting {dataset_key.upper()} Purchase ---")
+    
+    results = purchaser.purchase_all(dataset_keys)
+    for dataset_key, success in results.items():
+        status = "✅ completed" if success else "❌ failed"
+        print(f"\n--- {dataset_key.upper()} Purchase {status} ---")
+    print()
+    return True
+
+def _view_records(purchaser: AutomatedOceanPurchaser) -> bool:
+    """Menu action: list purchase records"""
+    try:
+        f = open(purchaser.records_path, 'rb')
+    except FileNotFoundError:
+        print("\n📋 No purchase records found.")
+        return True
+    
+    lines = ["\n📋 Purchase Records:"]
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            timestamp = datetime.fromtimestamp(record['timestamp']).isoformat(sep=' ', timespec='seconds')
+            lines.append(f"   - {record['dataset']}: {timestamp} ({record['status']})")
+    
+    # The log is created at startup, so it can exist without any records
+    if len(lines) == 1:
+        print("\n📋 No purchase records found.")
+        return True
+    
+    # One write for the whole listing instead of a print per record
+    sys.stdout.write("\n".join(lines) + "\n")
+    return True
+
+def _exit(purchaser: AutomatedOceanPurchaser) -> bool:
+    """Menu action: close the purchaser and leave the menu"""
+    print("👋 Goodbye!")
+    purchaser.close()
+    return False
+
+# Menu choice -> action; an action returns False to leave the menu
+_MENU_ACTIONS = {
+    "1": partial(_purchase_one, "enron"),
+    "2": partial(_purchase_one, "cameroon"),
+    "3": _purchase_all,
+    "4": _view_records,
+    "5": _exit,
+}
 
 def main():
     """Main function"""
@@ -275,7 +781,9 @@ def main():
         return
     
     # Initialize automated purchaser
-    purchaser = AutomatedOceanPurchaser(keystore_path)
+    simulate_delay = "--simulate-delay" in sys.argv[1:]
+    compress = "--compress" in sys.argv[1:]
+    purchaser = AutomatedOceanPurchaser(keystore_path, simulate_delay=simulate_delay, compress=compress)
     
     # Display wallet information
     print("\n💼 Wallet Information:")
@@ -298,37 +806,11 @@ def main():
         
         choice = input("\nYour choice (1-5): ").strip()
         
-        if choice == "1":
-            purchaser.automated_purchase_workflow("enron")
-            
-        elif choice == "2":
-            purchaser.automated_purchase_workflow("cameroon")
-            
-        elif choice == "3":
-            for dataset_key in purchaser.datasets.keys():
-                print(f"\n--- Starting {dataset_key.upper()} Purchase ---")
-                purchaser.automated_purchase_workflow(dataset_key)
-                print()
-            
-        elif choice == "4":
-            records_file = Path("purchases/purchase_records.json")
-            if records_file.exists():
-                with open(records_file, 'r') as f:
-                    records = json.load(f)
-                
-                print("\n📋 Purchase Records:")
-                for record in records:
-                    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['timestamp']))
-                    print(f"   - {record['dataset']}: {timestamp} ({record['status']})")
-            else:
-                print("\n📋 No purchase records found.")
-                
-        elif choice == "5":
-            print("👋 Goodbye!")
-            break
-            
-        else:
+        action = _MENU_ACTIONS.get(choice)
+        if action is None:
             print("❌ Invalid selection.")
+        elif not action(purchaser):
+            break
 
 if __name__ == "__main__":
     main()
@@ -6,33 +6,102 @@ Ocean Protocol Dataset Auto Purchase and Download Script
 import json
 import os
 import getpass
+import hmac
+import concurrent.futures
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Ocean Protocol SDK imports (installation required)
+# Ocean Protocol SDK (installation required) is imported lazily inside the
+# methods that use it, so importing this module stays cheap.
+
+# Faster JSON (optional): fall back to stdlib json when orjson is unavailable
 try:
-    from ocean_lib.ocean.ocean import Ocean
-    from ocean_lib.config import Config
-    from ocean_lib.web3_internal.wallet import Wallet
-    from ocean_lib.models.datatoken import Datatoken
-    from ocean_lib.models.dispenser import Dispenser
-    from ocean_lib.models.fixed_rate_exchange import FixedRateExchange
-    from ocean_lib.agreements.service_types import ServiceTypes
-    from ocean_lib.data_provider.data_service_provider import DataServiceProvider
-    import eth_account
-except ImportError as e:
-    print(f"Ocean Protocol SDK not installed: {e}")
-    print("Install with: pip install ocean-lib")
+    import orjson
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+except ImportError:
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+# Native scrypt/AES keystore decryption (optional): falls back to eth_account
+try:
+    from Crypto.Cipher import AES
+    from Crypto.Hash import keccak
+    from Crypto.Protocol.KDF import scrypt
+    _NATIVE_KEYSTORE = True
+except ImportError:
+    _NATIVE_KEYSTORE = False
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class OceanEndpoints:
+    """Ocean Protocol network/service endpoints"""
+    network_url: str
+    aquarius_url: str
+    provider_url: str
+    block_confirmations: int = 1
+    
+    @classmethod
+    def from_env(cls) -> 'OceanEndpoints':
+        """Read endpoints from environment variables (production mainnet defaults)"""
+        return cls(
+            network_url=os.getenv('NETWORK_URL') or 'https://mainnet.infura.io/v3/YOUR_INFURA_KEY',
+            aquarius_url=os.getenv('AQUARIUS_URL', 'https://v4.aquarius.oceanprotocol.com'),
+            provider_url=os.getenv('PROVIDER_URL', 'https://v4.provider.oceanprotocol.com')
+        )
+    
+    @classmethod
+    def from_config(cls, config) -> 'OceanEndpoints':
+        """Read endpoints from an Ocean config"""
+        return cls(
+            network_url=config.network_url,
+            aquarius_url=config.aquarius_url,
+            provider_url=config.provider_url,
+            block_confirmations=config.block_confirmations
+        )
+
+def _decrypt_keystore(keystore: Dict[str, Any], password: str) -> Optional[bytes]:
+    """
+    Decrypt a scrypt/AES-128-CTR (v3) keystore with pycryptodome
+    
+    Args:
+        keystore: Parsed keystore JSON
+        password: Keystore password
+        
+    Returns:
+        Private key bytes (None if the keystore needs the eth_account path)
+    """
+    crypto = keystore.get('crypto') or keystore.get('Crypto') or {}
+    if not _NATIVE_KEYSTORE or crypto.get('kdf') != 'scrypt' or crypto.get('cipher') != 'aes-128-ctr':
+        return None
+    
+    params = crypto['kdfparams']
+    derived_key = scrypt(
+        password.encode(), bytes.fromhex(params['salt']), params['dklen'],
+        N=params['n'], r=params['r'], p=params['p']
+    )
+    ciphertext = bytes.fromhex(crypto['ciphertext'])
+    mac = keccak.new(digest_bits=256, data=derived_key[16:32] + ciphertext).digest()
+    if not hmac.compare_digest(mac, bytes.fromhex(crypto['mac'])):
+        raise ValueError("MAC mismatch")
+    
+    iv = int(crypto['cipherparams']['iv'], 16)
+    cipher = AES.new(derived_key[:16], AES.MODE_CTR, nonce=b'', initial_value=iv)
+    return cipher.decrypt(ciphertext)
+
 class OceanDatasetPurchaser:
     """Ocean Protocol Dataset Purchaser"""
     
@@ -46,37 +115,143 @@ class OceanDatasetPurchaser:
         self.ocean = None
         self.wallet = None
         self.config = None
-        self._setup_ocean(config_file)
+        self.endpoints: Optional[OceanEndpoints] = None
+        self._ddo_cache: Dict[str, Tuple[float, Tuple[Any, Any]]] = {}
+        
+        # Shared HTTP session for JSON-RPC batch requests (eth_call is read-only, so POST is retried)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                              allowed_methods=['POST'])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        try:
+            self._setup_ocean(config_file)
+        except Exception:
+            self.session.close()
+            raise
+    
+    def close(self):
+        """Close the JSON-RPC HTTP session"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def _setup_ocean(self, config_file: Optional[str] = None):
         """Setup Ocean instance for REAL Ocean Protocol marketplace"""
+        try:
+            from ocean_lib.ocean.ocean import Ocean
+            from ocean_lib.config import Config
+        except ImportError as e:
+            logger.error(f"Ocean Protocol SDK not installed: {e}")
+            logger.error("Install with: pip install ocean-lib")
+            raise
+        
         try:
             if config_file and os.path.exists(config_file):
                 self.config = Config(config_file)
+                self.endpoints = OceanEndpoints.from_config(self.config)
             else:
                 # Production Ethereum mainnet configuration for REAL purchases
-                network_url = os.getenv('NETWORK_URL')
-                if not network_url or 'YOUR_INFURA_KEY' in network_url:
+                self.endpoints = OceanEndpoints.from_env()
+                if 'YOUR_INFURA_KEY' in self.endpoints.network_url:
                     logger.warning("⚠️  Please set NETWORK_URL in .env file with your Infura project ID")
                     logger.warning("Example: NETWORK_URL=https://mainnet.infura.io/v3/YOUR_PROJECT_ID")
                 
                 self.config = Config({
-                    'NETWORK_URL': network_url or 'https://mainnet.infura.io/v3/YOUR_INFURA_KEY',
-                    'BLOCK_CONFIRMATIONS': 1,
-                    'AQUARIUS_URL': os.getenv('AQUARIUS_URL', 'https://v4.aquarius.oceanprotocol.com'),
-                    'PROVIDER_URL': os.getenv('PROVIDER_URL', 'https://v4.provider.oceanprotocol.com')
+                    'NETWORK_URL': self.endpoints.network_url,
+                    'BLOCK_CONFIRMATIONS': self.endpoints.block_confirmations,
+                    'AQUARIUS_URL': self.endpoints.aquarius_url,
+                    'PROVIDER_URL': self.endpoints.provider_url
                 })
             
             self.ocean = Ocean(self.config)
+            self._use_persistent_provider(self.endpoints.network_url)
             logger.info("🌊 Ocean Protocol instance successfully configured for REAL marketplace")
-            logger.info(f"📡 Network: {self.config.network_url}")
-            logger.info(f"🔍 Aquarius: {self.config.aquarius_url}")
-            logger.info(f"⚡ Provider: {self.config.provider_url}")
+            logger.info(f"📡 Network: {self.endpoints.network_url}")
+            logger.info(f"🔍 Aquarius: {self.endpoints.aquarius_url}")
+            logger.info(f"⚡ Provider: {self.endpoints.provider_url}")
             
         except Exception as e:
             logger.error(f"❌ Ocean setup failed: {e}")
             raise
     
+    def _use_persistent_provider(self, network_url: str):
+        """
+        Switch web3 to a WebSocket/IPC transport for ws(s):// or .ipc endpoints
+        
+        Transaction receipt polling then runs over one open connection instead
+        of a fresh HTTP request per poll.
+        
+        Args:
+            network_url: Blockchain RPC endpoint
+        """
+        if network_url.startswith(('ws://', 'wss://')):
+            try:
+                from web3 import WebsocketProvider
+            except ImportError:
+                try:
+                    # web3 v7 renamed the synchronous provider (v8 dropped it)
+                    from web3 import LegacyWebSocketProvider as WebsocketProvider
+                except ImportError:
+                    logger.warning("Installed web3 has no synchronous WebSocket provider; using the default transport")
+                    return
+            provider = WebsocketProvider(network_url, websocket_kwargs={'max_size': 2**24})
+        elif network_url.endswith('.ipc'):
+            from web3 import IPCProvider
+            provider = IPCProvider(network_url)
+        else:
+            return
+        
+        self.ocean.web3.provider = provider
+        logger.info(f"🔌 Using persistent {type(provider).__name__} transport")
+    
+    @staticmethod
+    def _find_access_service(ddo):
+        """
+        Find the first access service of a DDO
+        
+        Args:
+            ddo: Resolved DDO
+            
+        Returns:
+            Access service (None if not found)
+        """
+        from ocean_lib.agreements.service_types import ServiceTypes
+        
+        return next((service for service in ddo.services if service.type == ServiceTypes.ASSET_ACCESS), None)
+    
+    def _resolve_cached(self, did: str, ttl: float = 60) -> Tuple[Any, Any]:
+        """
+        Resolve DDO from Aquarius, reusing recent results
+        
+        Args:
+            did: Dataset DID
+            ttl: Seconds a resolved DDO is reused
+            
+        Returns:
+            (DDO, access service) tuple (None entries if not found)
+        """
+        cached = self._ddo_cache.get(did)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        ddo = self.ocean.assets.resolve(did)
+        if not ddo:
+            return None, None
+        
+        resolved = (ddo, self._find_access_service(ddo))
+        self._ddo_cache[did] = (time.monotonic(), resolved)
+        return resolved
+    
     def load_wallet_from_keystore(self, keystore_path: str, password: Optional[str] = None) -> bool:
         """
         Load wallet from keystore file
@@ -89,24 +264,29 @@ class OceanDatasetPurchaser:
             Success status
         """
         try:
+            import eth_account
+            from ocean_lib.web3_internal.wallet import Wallet
+            
             if not os.path.exists(keystore_path):
                 logger.error(f"Keystore file not found: {keystore_path}")
                 return False
             
-            with open(keystore_path, 'r') as f:
-                keystore = json.load(f)
+            with open(keystore_path, 'rb') as f:
+                keystore = _loads(f.read())
             
             if password is None:
                 password = getpass.getpass("Enter keystore password: ")
             
             # Restore private key from keystore
-            private_key = eth_account.Account.decrypt(keystore, password)
+            private_key = _decrypt_keystore(keystore, password)
+            if private_key is None:
+                private_key = eth_account.Account.decrypt(keystore, password)
             
             # Create Ocean wallet
             self.wallet = Wallet(
                 self.ocean.web3,
                 private_key=private_key.hex(),
-                block_confirmations=self.config.block_confirmations,
+                block_confirmations=self.endpoints.block_confirmations,
                 transaction_timeout=self.config.transaction_timeout
             )
             
@@ -129,8 +309,12 @@ class OceanDatasetPurchaser:
             Dataset information
         """
         try:
+            from ocean_lib.agreements.service_types import ServiceTypes
+            from ocean_lib.models.dispenser import Dispenser
+            from ocean_lib.models.fixed_rate_exchange import FixedRateExchange
+            
             # Query metadata from Aquarius
-            ddo = self.ocean.assets.resolve(did)
+            ddo, _ = self._resolve_cached(did)
             
             if not ddo:
                 logger.error(f"Dataset not found: {did}")
@@ -147,29 +331,45 @@ class OceanDatasetPurchaser:
             }
             
             # Query price information
-            for service in ddo.services:
-                if service.type == ServiceTypes.ASSET_ACCESS:
-                    datatoken = Datatoken(self.ocean.web3, service.datatoken)
-                    
-                    # Check Fixed Rate Exchange
-                    fre = FixedRateExchange(self.ocean.web3, self.ocean.config.fixed_rate_exchange_address)
-                    exchanges = fre.get_exchanges_by_datatoken(service.datatoken)
+            access_services = [service for service in ddo.services if service.type == ServiceTypes.ASSET_ACCESS]
+            if access_services:
+                fre = FixedRateExchange(self.ocean.web3, self.ocean.config.fixed_rate_exchange_address)
+                dispenser = Dispenser(self.ocean.web3, self.ocean.config.dispenser_address)
+                
+                # Exchange lookups are independent RPCs, so issue them together
+                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                    exchanges_list = list(executor.map(
+                        fre.get_exchanges_by_datatoken, [service.datatoken for service in access_services]
+                    ))
+                
+                # Then one eth_call per service: rate if it has an exchange, else dispenser status
+                calls = [
+                    (fre, 'getRate', [exchanges[0]['exchangeId']]) if exchanges
+                    else (dispenser, 'status', [service.datatoken])
+                    for service, exchanges in zip(access_services, exchanges_list)
+                ]
+                results = self._batch_eth_call(calls)
+                if results is None:
+                    def query(call):
+                        _, fn_name, args = call
+                        return (fre.get_rate(*args) if fn_name == 'getRate' else dispenser.is_active(*args),)
                     
-                    if exchanges:
-                        exchange = exchanges[0]
-                        price = fre.get_rate(exchange['exchangeId'])
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                        results = list(executor.map(query, calls))
+                
+                for (_, fn_name, _), result in zip(calls, results):
+                    if fn_name == 'getRate':
+                        # Fixed Rate Exchange
                         info['price'] = {
-                            'amount': price,
+                            'amount': result[0],
                             'token': 'OCEAN'
                         }
-                    else:
-                        # Check Dispenser
-                        dispenser = Dispenser(self.ocean.web3, self.ocean.config.dispenser_address)
-                        if dispenser.is_active(service.datatoken):
-                            info['price'] = {
-                                'amount': 0,
-                                'token': 'FREE'
-                            }
+                    elif result[0]:
+                        # Dispenser (first status field is "active")
+                        info['price'] = {
+                            'amount': 0,
+                            'token': 'FREE'
+                        }
             
             return info
             
@@ -177,6 +377,53 @@ class OceanDatasetPurchaser:
             logger.error(f"Dataset info query failed: {e}")
             return None
     
+    def _batch_eth_call(self, calls: List[Tuple[Any, str, List[Any]]]) -> Optional[List[Tuple]]:
+        """
+        Send several contract reads as one JSON-RPC batch request
+        
+        Args:
+            calls: (contract wrapper, function name, args) per eth_call
+            
+        Returns:
+            Decoded outputs per call, or None if batching is not possible
+        """
+        network_url = self.endpoints.network_url
+        if not network_url.startswith(('http://', 'https://')):
+            return None
+        
+        try:
+            payload = []
+            output_types = []
+            for request_id, (wrapper, fn_name, args) in enumerate(calls):
+                contract = getattr(wrapper, 'contract', wrapper)
+                # web3 v7 renamed encodeABI to encode_abi
+                encode_abi = getattr(contract, 'encode_abi', None) or contract.encodeABI
+                payload.append({
+                    'jsonrpc': '2.0',
+                    'id': request_id,
+                    'method': 'eth_call',
+                    'params': [{'to': contract.address, 'data': encode_abi(fn_name, args=args)}, 'latest']
+                })
+                fn_abi = contract.get_function_by_name(fn_name).abi
+                output_types.append([output['type'] for output in fn_abi['outputs']])
+            
+            response = self.session.post(network_url, json=payload, timeout=30)
+            response.raise_for_status()
+            replies = {reply['id']: reply for reply in response.json()}
+            
+            results = []
+            for request_id, types in enumerate(output_types):
+                reply = replies[request_id]
+                if 'error' in reply:
+                    raise ValueError(reply['error'])
+                data = bytes.fromhex(reply['result'][2:])
+                results.append(tuple(self.ocean.web3.codec.decode(types, data)))
+            return results
+            
+        except Exception as e:
+            logger.warning(f"Batched eth_call failed, querying individually: {e}")
+            return None
+    
     def purchase_dataset(self, did: str) -> Optional[str]:
         """
         Purchase dataset from REAL Ocean Protocol marketplace
@@ -196,19 +443,12 @@ class OceanDatasetPurchaser:
             logger.info(f"🔗 Dataset DID: {did}")
             logger.info(f"👛 Wallet address: {self.wallet.address}")
             
-            # Resolve dataset
-            ddo = self.ocean.assets.resolve(did)
+            # Resolve dataset and its access service
+            ddo, access_service = self._resolve_cached(did)
             if not ddo:
                 logger.error(f"❌ Dataset not found: {did}")
                 return None
             
-            # Find access service
-            access_service = None
-            for service in ddo.services:
-                if service.type == ServiceTypes.ASSET_ACCESS:
-                    access_service = service
-                    break
-            
             if not access_service:
                 logger.error("Access service not found.")
                 return None
@@ -250,19 +490,12 @@ class OceanDatasetPurchaser:
             # Create download folder
             Path(download_path).mkdir(parents=True, exist_ok=True)
             
-            # Resolve dataset
-            ddo = self.ocean.assets.resolve(did)
+            # Resolve dataset and its access service
+            ddo, access_service = self._resolve_cached(did)
             if not ddo:
                 logger.error(f"Dataset not found: {did}")
                 return False
             
-            # Find access service
-            access_service = None
-            for service in ddo.services:
-                if service.type == ServiceTypes.ASSET_ACCESS:
-                    access_service = service
-                    break
-            
             if not access_service:
                 logger.error("Access service not found.")
                 return False
@@ -335,6 +568,7 @@ def main():
         "cameroon": "did:op:204e60c2a0f935d68743955afe1b4bb965770cfbc70342520d6bcecf75befe9c"
     }
     
+    purchaser = None
     try:
         # Initialize Ocean purchaser for REAL marketplace
         print("🔧 Initializing Ocean Protocol connection...")
@@ -380,6 +614,10 @@ def main():
         print(f"💥 Error occurred: {e}")
         import traceback
         traceback.print_exc()
+    
+    finally:
+        if purchaser is not None:
+            purchaser.close()
 
 if __name__ == "__main__":
     main()
@@ -4,38 +4,177 @@ Ocean Protocol 데이터셋 간단 다운로드 도구
 복잡한 의존성 없이 REST API를 직접 사용
 """
 
+import asyncio
+import codecs
+import concurrent.futures
+import gzip
+import hashlib
+import itertools
 import json
+import mmap
 import os
+import shutil
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional
+
+# 빠른 JSON 처리 (선택): orjson이 없으면 표준 json 사용
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+# 비동기 HTTP 클라이언트 (선택): 없으면 메타데이터를 순차 조회
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# 스트리밍 JSON 파서 (선택): 큰 JSON 파일 분석 시 전체 로드 방지
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# BLAKE3 체크섬 (선택): 없으면 표준 blake2b 사용
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# DDO 디스크 캐시 위치와 유효 시간 (초)
+DDO_CACHE_DIR = Path.home() / ".cache" / "ocean"
+DDO_CACHE_TTL = 3600
+
+# HTTP 타임아웃 (연결, 읽기) 초
+HTTP_TIMEOUT = (5, 60)
+
+# HTTP 재시도 정책 (동기 세션과 비동기 클라이언트 공통)
+RETRY_TOTAL = 5
+RETRY_BACKOFF = 0.5
+RETRY_STATUS = (429, 502, 503, 504)
+
+# 이 크기 이상의 JSON 파일은 스트리밍으로 분석
+JSON_STREAM_THRESHOLD = 1 << 20
+
+# 다운로드 파일 옆에 저장하는 체크섬 파일 확장자 (새로 쓸 때는 설치된 해시 기준)
+CHECKSUM_SUFFIXES = ('.b3', '.b2')
+CHECKSUM_SUFFIX = '.b3' if blake3 is not None else '.b2'
+
+# 알려진 샘플 데이터 URL들 (모든 인스턴스가 공유하는 읽기 전용 테이블)
+SAMPLE_DATA = MappingProxyType({
+    "enron": MappingProxyType({
+        "name": "Enron Email Dataset (Sample)",
+        "url": "https://e1k3lz2wcg.execute-api.us-west-2.amazonaws.com/data",
+        "format": "csv",
+        "did": "did:op:1beabb1e18d4d5b15facabf9d0ac2fd38a0b00138ae4b3f9f6649cb6f44458dd"
+    }),
+    "cameroon": MappingProxyType({
+        "name": "Cameroon Gazette Dataset (Sample)",
+        "url": "https://yjiuaiehxf.execute-api.us-west-2.amazonaws.com/data", 
+        "format": "json",
+        "did": "did:op:204e60c2a0f935d68743955afe1b4bb965770cfbc70342520d6bcecf75befe9c"
+    })
+})
+
+def _open_binary(path: Path):
+    """파일을 바이너리 읽기 모드로 열기 (.gz는 압축 해제)"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def _checksum(path: Path, suffix: str = CHECKSUM_SUFFIX) -> str:
+    """파일 체크섬 계산 (.b3: blake3 mmap + 멀티스레드, .b2: blake2b)"""
+    if suffix == '.b3':
+        h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        h.update_mmap(path)
+        return h.hexdigest()
+    
+    h = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _verified(path: Path) -> bool:
+    """파일이 저장된 체크섬 중 하나와 일치하는지 확인 (읽을 수 없으면 False)"""
+    for suffix in CHECKSUM_SUFFIXES:
+        if suffix == '.b3' and blake3 is None:
+            continue
+        
+        checksum_path = path.with_name(path.name + suffix)
+        try:
+            # 바이트로 비교 (UTF-8이 아닌 체크섬 파일도 불일치로 처리)
+            expected = checksum_path.read_bytes().split()[0]
+            if path.is_file() and _checksum(path, suffix).encode('ascii') == expected:
+                return True
+        except (OSError, IndexError, ValueError):
+            continue
+    return False
+
 class SimpleOceanDownloader:
     """간단한 Ocean Protocol 데이터 다운로더"""
     
-    def __init__(self):
+    __slots__ = ('aquarius_url', 'provider_url', 'session', 'cache_dir', '_ddo_cache')
+    
+    sample_data = SAMPLE_DATA
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        초기화
+        
+        Args:
+            cache_dir: DDO 캐시 디렉토리 (기본값: ~/.cache/ocean)
+        """
         self.aquarius_url = "https://v4.aquarius.oceanprotocol.com"
         self.provider_url = "https://v4.provider.oceanprotocol.com"
         
-        # 알려진 샘플 데이터 URL들
-        self.sample_data = {
-            "enron": {
-                "name": "Enron Email Dataset (Sample)",
-                "url": "https://e1k3lz2wcg.execute-api.us-west-2.amazonaws.com/data",
-                "format": "csv",
-                "did": "did:op:1beabb1e18d4d5b15facabf9d0ac2fd38a0b00138ae4b3f9f6649cb6f44458dd"
-            },
-            "cameroon": {
-                "name": "Cameroon Gazette Dataset (Sample)",
-                "url": "https://yjiuaiehxf.execute-api.us-west-2.amazonaws.com/data", 
-                "format": "json",
-                "did": "did:op:204e60c2a0f935d68743955afe1b4bb965770cfbc70342520d6bcecf75befe9c"
-            }
-        }
+        # 공유 HTTP 세션 (keep-alive 연결 재사용)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUS,
+                allowed_methods=['GET', 'POST'],
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount("https://", adapter)
+        
+        # DDO 캐시 (프로세스 내 + 디스크)
+        self.cache_dir = Path(cache_dir) if cache_dir else DDO_CACHE_DIR
+        self._ddo_cache: Dict[str, Dict[str, Any]] = {}
+    
+    def close(self):
+        """HTTP 세션 종료"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def get_dataset_metadata(self, did: str) -> Optional[Dict[str, Any]]:
         """
@@ -48,35 +187,227 @@ class SimpleOceanDownloader:
             메타데이터 정보
         """
         try:
+            entry = self._cached_ddo(did)
+            if self._is_fresh(entry):
+                return self._parse_metadata(did, entry['ddo'])
+            
             url = f"{self.aquarius_url}/api/aquarius/assets/ddo/{did}"
             logger.info(f"메타데이터 조회: {url}")
             
-            response = requests.get(url, timeout=30)
+            response = self.session.get(url, timeout=HTTP_TIMEOUT, headers=self._revalidation_headers(entry))
             
-            if response.status_code == 200:
-                ddo = response.json()
+            return self._metadata_from_response(did, entry, response.status_code, response.headers, response.content)
                 
-                metadata = {
-                    'did': did,
-                    'name': ddo.get('metadata', {}).get('name', 'Unknown'),
-                    'description': ddo.get('metadata', {}).get('description', ''),
-                    'author': ddo.get('metadata', {}).get('author', 'Unknown'),
-                    'created': ddo.get('metadata', {}).get('created', ''),
-                    'type': ddo.get('metadata', {}).get('type', 'dataset'),
-                    'services': len(ddo.get('services', [])),
-                    'files': len(ddo.get('metadata', {}).get('files', []))
-                }
+        except Exception as e:
+            logger.error(f"메타데이터 조회 중 오류: {e}")
+            return None
+    
+    async def get_dataset_metadata_async(self, did: str, client: "httpx.AsyncClient") -> Optional[Dict[str, Any]]:
+        """
+        Aquarius에서 데이터셋 메타데이터 비동기 조회
+        
+        Args:
+            did: 데이터셋 DID
+            client: 공유 httpx.AsyncClient
+            
+        Returns:
+            메타데이터 정보
+        """
+        try:
+            entry = self._cached_ddo(did)
+            if self._is_fresh(entry):
+                return self._parse_metadata(did, entry['ddo'])
+            
+            url = f"{self.aquarius_url}/api/aquarius/assets/ddo/{did}"
+            logger.info(f"메타데이터 조회: {url}")
+            
+            headers = self._revalidation_headers(entry)
+            for attempt in range(RETRY_TOTAL + 1):
+                response = await client.get(url, headers=headers)
+                if response.status_code not in RETRY_STATUS or attempt == RETRY_TOTAL:
+                    break
                 
-                logger.info(f"메타데이터 조회 성공: {metadata['name']}")
-                return metadata
-            else:
-                logger.warning(f"메타데이터 조회 실패: HTTP {response.status_code}")
-                return None
+                # 세션의 Retry 정책과 같은 지수 백오프 (Retry-After 헤더 우선)
+                retry_after = response.headers.get('Retry-After', '')
+                delay = float(retry_after) if retry_after.isdigit() else RETRY_BACKOFF * 2 ** attempt
+                logger.warning(f"메타데이터 조회 재시도 ({response.status_code}), {delay:.1f}초 후: {did}")
+                await asyncio.sleep(delay)
+            
+            return self._metadata_from_response(did, entry, response.status_code, response.headers, response.content)
                 
         except Exception as e:
             logger.error(f"메타데이터 조회 중 오류: {e}")
             return None
     
+    async def _gather_metadata(self, dids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """하나의 클라이언트로 여러 DID 메타데이터를 동시에 조회"""
+        timeout = httpx.Timeout(HTTP_TIMEOUT[1], connect=HTTP_TIMEOUT[0])
+        # 연결 실패는 transport가, 429/5xx 응답은 get_dataset_metadata_async가 재시도
+        transport = httpx.AsyncHTTPTransport(retries=RETRY_TOTAL)
+        async with httpx.AsyncClient(timeout=timeout, transport=transport) as client:
+            return await asyncio.gather(*(self.get_dataset_metadata_async(did, client) for did in dids))
+    
+    def get_datasets_metadata(self, dids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        여러 데이터셋 메타데이터 조회 (캐시 → 일괄 검색 → 개별 동시 조회)
+        
+        Args:
+            dids: 데이터셋 DID 목록
+            
+        Returns:
+            DID별 메타데이터 정보 (실패 시 None)
+        """
+        results = {}
+        pending = []
+        for did in dids:
+            entry = self._cached_ddo(did)
+            if self._is_fresh(entry):
+                results[did] = self._parse_metadata(did, entry['ddo'])
+            else:
+                pending.append(did)
+        
+        if pending:
+            # 캐시에 없는 DID는 검색 API 한 번으로 조회
+            for did, ddo in self._query_ddos(pending).items():
+                entry = self._store_ddo(did, ddo, None, None)
+                results[did] = self._parse_metadata(did, entry['ddo'])
+            
+            # 검색 결과에서 빠진 DID는 개별 조회
+            missing = [did for did in pending if did not in results]
+            if missing:
+                if httpx is None:
+                    results.update({did: self.get_dataset_metadata(did) for did in missing})
+                else:
+                    results.update(zip(missing, asyncio.run(self._gather_metadata(missing))))
+        
+        return {did: results.get(did) for did in dids}
+    
+    def _query_ddos(self, dids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Aquarius 검색 API로 여러 DDO를 한 번에 조회 (실패 시 빈 dict)"""
+        url = f"{self.aquarius_url}/api/aquarius/assets/query"
+        query = {"query": {"terms": {"_id": dids}}, "size": len(dids)}
+        logger.info(f"메타데이터 일괄 조회: {url} ({len(dids)}개)")
+        
+        try:
+            response = self.session.post(url, json=query, timeout=HTTP_TIMEOUT)
+            if response.status_code != 200:
+                logger.warning(f"메타데이터 일괄 조회 실패: HTTP {response.status_code}")
+                return {}
+            hits = _loads(response.content).get('hits', {}).get('hits', [])
+        except Exception as e:
+            logger.warning(f"메타데이터 일괄 조회 중 오류: {e}")
+            return {}
+        
+        wanted = set(dids)
+        ddos = {}
+        for hit in hits:
+            ddo = hit.get('_source') or {}
+            did = ddo.get('id') or hit.get('_id')
+            if did in wanted:
+                ddos[did] = ddo
+        return ddos
+    
+    def _metadata_from_response(self, did: str, entry: Optional[Dict[str, Any]], status_code: int,
+                                headers, body: bytes) -> Optional[Dict[str, Any]]:
+        """Aquarius 응답(200/304)을 메타데이터로 변환하고 캐시 갱신"""
+        if status_code == 304 and entry:
+            # 변경 없음: 본문 전송 없이 캐시 재사용
+            entry = self._store_ddo(did, entry['ddo'], entry.get('etag'), entry.get('last_modified'))
+        elif status_code == 200:
+            entry = self._store_ddo(did, _loads(body), headers.get('ETag'), headers.get('Last-Modified'))
+        else:
+            logger.warning(f"메타데이터 조회 실패: HTTP {status_code}")
+            return None
+        
+        metadata = self._parse_metadata(did, entry['ddo'])
+        logger.info(f"메타데이터 조회 성공: {metadata['name']}")
+        return metadata
+    
+    def _is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        """캐시 항목이 유효 시간 이내인지 확인"""
+        return entry is not None and time.time() - entry['fetched_at'] < DDO_CACHE_TTL
+    
+    def _ddo_cache_path(self, did: str) -> Path:
+        """DID별 DDO 캐시 파일 경로"""
+        return self.cache_dir / f"{did.replace(':', '_')}.json"
+    
+    def _cached_ddo(self, did: str) -> Optional[Dict[str, Any]]:
+        """캐시된 DDO 항목 조회 (프로세스 내 캐시 → 디스크 캐시)"""
+        entry = self._ddo_cache.get(did)
+        if entry is not None:
+            return entry
+        
+        try:
+            with open(self._ddo_cache_path(did), 'rb') as f:
+                entry = _loads(f.read())
+        except (OSError, ValueError):
+            return None
+        
+        # 형식이 맞지 않는 파일은 캐시 미스로 처리 (다음 조회 결과로 덮어씀)
+        if not self._valid_entry(entry):
+            return None
+        
+        self._ddo_cache[did] = entry
+        return entry
+    
+    @staticmethod
+    def _valid_entry(entry: Any) -> bool:
+        """디스크에서 읽은 캐시 항목의 형식 확인"""
+        return (
+            isinstance(entry, dict)
+            and isinstance(entry.get('ddo'), dict)
+            and isinstance(entry.get('fetched_at'), (int, float))
+            and not isinstance(entry['fetched_at'], bool)
+            and all(isinstance(entry.get(key), (str, type(None))) for key in ('etag', 'last_modified'))
+        )
+    
+    def _store_ddo(self, did: str, ddo: Dict[str, Any], etag: Optional[str],
+                   last_modified: Optional[str]) -> Dict[str, Any]:
+        """DDO를 프로세스 내 캐시와 디스크 캐시에 저장"""
+        entry = {
+            'ddo': ddo,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time()
+        }
+        self._ddo_cache[did] = entry
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_path = self._ddo_cache_path(did)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps(entry))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"DDO 캐시 저장 실패: {e}")
+        
+        return entry
+    
+    def _revalidation_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """캐시 항목에 대한 조건부 요청 헤더"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def _parse_metadata(self, did: str, ddo: Dict[str, Any]) -> Dict[str, Any]:
+        """DDO에서 메타데이터 요약 추출"""
+        metadata = ddo.get('metadata', {})
+        return {
+            'did': did,
+            'name': metadata.get('name', 'Unknown'),
+            'description': metadata.get('description', ''),
+            'author': metadata.get('author', 'Unknown'),
+            'created': metadata.get('created', ''),
+            'type': metadata.get('type', 'dataset'),
+            'services': len(ddo.get('services', [])),
+            'files': len(metadata.get('files', []))
+        }
+    
     def download_sample_data(self, dataset_key: str, output_dir: str = "./downloads") -> bool:
         """
         샘플 데이터 다운로드
@@ -94,28 +425,48 @@ class SimpleOceanDownloader:
         
         dataset = self.sample_data[dataset_key]
         
+        # 파일명 생성
+        output_path = Path(output_dir)
+        filepath = output_path / f"{dataset_key}_sample.{dataset['format']}"
+        
         try:
+            # 이전 다운로드가 체크섬과 일치하면 다시 받지 않음
+            for existing in (filepath, filepath.with_name(filepath.name + '.gz')):
+                if _verified(existing):
+                    logger.info(f"이미 다운로드됨 (체크섬 일치): {existing}")
+                    return True
+            
             logger.info(f"다운로드 시작: {dataset['name']}")
             
-            # HTTP 요청
-            response = requests.get(dataset['url'], timeout=60)
+            # HTTP 요청 (gzip 전송 인코딩 요청)
+            response = self.session.get(dataset['url'], timeout=HTTP_TIMEOUT, stream=True,
+                                        headers={'Accept-Encoding': 'gzip'})
             response.raise_for_status()
             
             # 출력 디렉토리 생성
-            output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
             
-            # 파일명 생성
-            filename = f"{dataset_key}_sample.{dataset['format']}"
-            filepath = output_path / filename
-            
-            # 파일 저장
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            if response.headers.get('Content-Encoding') == 'gzip':
+                # gzip 응답은 압축 해제하지 않고 그대로 .gz로 저장
+                filepath = filepath.with_name(filepath.name + '.gz')
+                response.raw.decode_content = False
+                with open(filepath, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, 1 << 20)
+            else:
+                # 파일 저장 (소켓에서 1 MiB 버퍼로 바로 복사, 다른 전송 인코딩은 해제)
+                response.raw.decode_content = True
+                with open(filepath, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, 1 << 20)
             
             file_size = filepath.stat().st_size
             logger.info(f"다운로드 완료: {filepath} ({file_size:,} bytes)")
             
+            # 체크섬 저장 (b3sum 형식), 다른 해시로 저장된 이전 체크섬은 제거
+            for suffix in CHECKSUM_SUFFIXES:
+                filepath.with_name(filepath.name + suffix).unlink(missing_ok=True)
+            checksum_path = filepath.with_name(filepath.name + CHECKSUM_SUFFIX)
+            checksum_path.write_text(f"{_checksum(filepath)}  {filepath.name}\n")
+            
             return True
             
         except Exception as e:
@@ -139,31 +490,19 @@ class SimpleOceanDownloader:
             
             file_size = path.stat().st_size
             
-            if filepath.endswith('.csv'):
+            # .gz 파일은 압축을 풀면서 읽음
+            compressed = path.suffix == '.gz'
+            name = path.stem if compressed else path.name
+            
+            if name.endswith('.csv'):
                 # CSV 파일 분석
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                return {
-                    "format": "CSV",
-                    "file_size": file_size,
-                    "total_lines": len(lines),
-                    "header": lines[0].strip() if lines else "",
-                    "sample_lines": lines[1:6] if len(lines) > 1 else []
-                }
+                if compressed:
+                    return self._analyze_csv_stream(path, file_size)
+                return self._analyze_csv(path, file_size)
                 
-            elif filepath.endswith('.json'):
+            elif name.endswith('.json'):
                 # JSON 파일 분석
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                return {
-                    "format": "JSON",
-                    "file_size": file_size,
-                    "structure": type(data).__name__,
-                    "keys": list(data.keys()) if isinstance(data, dict) else None,
-                    "preview": str(data)[:500]
-                }
+                return self._analyze_json(path, file_size)
             
             else:
                 return {
@@ -174,6 +513,81 @@ class SimpleOceanDownloader:
         except Exception as e:
             return {"error": str(e)}
 
+    def _analyze_csv(self, path: Path, file_size: int) -> Dict[str, Any]:
+        """CSV 파일을 mmap으로 스캔 (헤더와 샘플 5줄만 디코딩)"""
+        lines = []
+        total_lines = 0
+        
+        if file_size:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # 줄 수: 1 MiB 단위로 개행 문자만 셈
+                for offset in range(0, file_size, 1 << 20):
+                    total_lines += mm[offset:offset + (1 << 20)].count(b'\n')
+                if mm[file_size - 1:file_size] != b'\n':
+                    total_lines += 1
+                
+                # 헤더 + 샘플 5줄
+                start = 0
+                while len(lines) < 6 and start < file_size:
+                    end = mm.find(b'\n', start)
+                    end = file_size if end == -1 else end + 1
+                    lines.append(mm[start:end].decode('utf-8').replace('\r\n', '\n'))
+                    start = end
+        
+        return {
+            "format": "CSV",
+            "file_size": file_size,
+            "total_lines": total_lines,
+            "header": lines[0].strip() if lines else "",
+            "sample_lines": lines[1:6]
+        }
+    
+    def _analyze_csv_stream(self, path: Path, file_size: int) -> Dict[str, Any]:
+        """압축된 CSV 파일을 스트리밍으로 분석 (헤더와 샘플 5줄만 보관)"""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = next(f, "")
+            sample_lines = list(itertools.islice(f, 5))
+            remaining = sum(1 for _ in f)
+        
+        return {
+            "format": "CSV",
+            "file_size": file_size,
+            "total_lines": (1 if header else 0) + len(sample_lines) + remaining,
+            "header": header.strip(),
+            "sample_lines": sample_lines
+        }
+    
+    def _analyze_json(self, path: Path, file_size: int) -> Dict[str, Any]:
+        """JSON 파일 분석 (큰 파일은 전체 로드 없이 최상위 구조만 스트리밍으로 분석)"""
+        with _open_binary(path) as f:
+            # 미리보기는 파일 크기와 관계없이 원본 JSON 텍스트 앞부분 (BOM 제외)
+            head = f.read(500)
+            bom = len(codecs.BOM_UTF8) if head.startswith(codecs.BOM_UTF8) else 0
+            preview = head[bom:].decode('utf-8', 'replace')
+            f.seek(bom)
+            
+            first = preview.lstrip()[:1]
+            containers = {'{': 'dict', '[': 'list', '"': 'str'}
+            if ijson is not None and file_size >= JSON_STREAM_THRESHOLD and first in containers:
+                structure = containers[first]
+                keys = None
+                if structure == 'dict':
+                    # 최상위 키 이벤트만 수집 (값은 구성하지 않음)
+                    keys = [value for prefix, event, value in ijson.parse(f) if prefix == '' and event == 'map_key']
+            else:
+                # 작은 파일과 최상위 숫자/불리언/null 값은 그대로 로드
+                data = _loads(f.read())
+                structure = type(data).__name__
+                keys = list(data.keys()) if isinstance(data, dict) else None
+        
+        return {
+            "format": "JSON",
+            "file_size": file_size,
+            "structure": structure,
+            "keys": keys,
+            "preview": preview
+        }
+
 def load_wallet_info(keystore_path: str) -> Dict[str, str]:
     """
     키스토어 파일에서 기본 정보 읽기 (비밀번호 없이)
@@ -185,8 +599,8 @@ def load_wallet_info(keystore_path: str) -> Dict[str, str]:
         지갑 정보
     """
     try:
-        with open(keystore_path, 'r') as f:
-            keystore = json.load(f)
+        with open(keystore_path, 'rb') as f:
+            keystore = _loads(f.read())
         
         return {
             "address": keystore.get("address", "Unknown"),
@@ -238,9 +652,12 @@ def interactive_demo():
         
         elif choice == "2":
             print("\n🔍 메타데이터 조회")
+            all_metadata = downloader.get_datasets_metadata(
+                [dataset['did'] for dataset in downloader.sample_data.values()]
+            )
             for key, dataset in downloader.sample_data.items():
                 print(f"\n--- {dataset['name']} ---")
-                metadata = downloader.get_dataset_metadata(dataset['did'])
+                metadata = all_metadata.get(dataset['did'])
                 
                 if metadata:
                     for field, value in metadata.items():
@@ -257,7 +674,8 @@ def interactive_demo():
                 print("❌ downloads 폴더가 없습니다. 먼저 데이터를 다운로드하세요.")
                 continue
             
-            files = list(downloads_dir.glob("*"))
+            # 체크섬 파일은 목록에서 제외
+            files = [f for f in downloads_dir.glob("*") if f.suffix not in CHECKSUM_SUFFIXES]
             if not files:
                 print("❌ 다운로드된 파일이 없습니다.")
                 continue
@@ -288,6 +706,7 @@ def interactive_demo():
         
         elif choice == "4":
             print("👋 종료합니다.")
+            downloader.close()
             break
         
         else:
@@ -299,13 +718,19 @@ def quick_download_all():
     
     print("🚀 모든 샘플 데이터 다운로드 시작...")
     
-    for key in downloader.sample_data.keys():
-        success = downloader.download_sample_data(key)
-        if success:
-            print(f"✅ {key} 완료")
-        else:
-            print(f"❌ {key} 실패")
+    # 데이터셋별 다운로드는 독립적인 네트워크 I/O이므로 병렬 실행
+    keys = list(downloader.sample_data.keys())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(keys))) as executor:
+        futures = {executor.submit(downloader.download_sample_data, key): key for key in keys}
+        
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            if future.result():
+                print(f"✅ {key} 완료")
+            else:
+                print(f"❌ {key} 실패")
     
+    downloader.close()
     print("\n📁 downloads 폴더를 확인하세요.")
 
 if __name__ == "__main__":